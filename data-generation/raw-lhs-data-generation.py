@@ -4,7 +4,10 @@
 import numpy as np
 import pandas as pd
 import random
-from pyDOE import *
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from numba import njit, prange
+from scipy.stats import qmc
 
 # Generate combinations of LR, LC, RC, LD, RD, LNNZ, and RNNZ using the LSH algorithm.
 def lhs_generate():
@@ -12,12 +15,19 @@ def lhs_generate():
     # We generate 2,500,000 distinct cases of NRL, NCL, and NCR combinations as candidate experiment scenarios.
     sample = 2500000
 
+    # A seeded PCG64 generator drives every random draw so that the dataset is reproducible
+    rng = np.random.default_rng(42)
+
+    # All columns live in one preallocated float32 buffer, stored column by column (lr, lc, rc, ld, rd, lnnz, rnnz)
+    out = np.empty((sample, 7), dtype=np.float32, order='F')
+    lr, lc, rc, ld, rd, lnnz, rnnz = out.T
+
     # Using the LHS algorithm with a uniform distribution function, 
     # we first generate a floating point value in the range of 0.0 and 1.0 
     # and multiply the maximum value in each dimension to the generated value to determine experimental cases. 
-    lr = lhs(1, samples=sample) * 150000
-    lc = lhs(1, samples=sample) * 100000
-    rc = lhs(1, samples=sample) * 50000
+    # All three dimensions are drawn jointly in a single call, which keeps the Latin property across columns.
+    engine = qmc.LatinHypercube(d=3, seed=rng)
+    out[:, 0:3] = engine.random(n=sample) * np.array([150000, 100000, 50000])
 
     # We measure the density values using the DBLP, Amazon, Youtube, Orkut, LiveJournal dataset provided by Stanford SNAP dataset which results in the total of 30 left matrix density values.
     ld_list = [0.00108175, 0.00082282, 0.00056263, 0.00034241, 0.00015297, 0.00002088, 0.00163948, 0.00078778, 0.00041097, 0.00019487, 0.00008429, 0.00001651, 0.02533638, 0.00952101, 0.00296184, 0.00082185, 0.00018467, 0.00000464, 0.01084252, 0.00860544, 0.00491597, 0.00160539, 0.00047003, 0.00002483, 0.00370564, 0.00182521, 0.00082487, 0.00031941, 0.00013363, 0.00000434]
@@ -26,23 +36,42 @@ def lhs_generate():
 
     # Select random samples from the given one-dimensional array 
     # and generate ld and rd as many as the number of sample
-    ld = np.random.choice(ld_list, size=(sample,1))
-    rd = np.random.choice(rd_list, size=(sample,1))
+    # by drawing int8 indices and gathering from float32 lookup tables
+    ld_lut = np.asarray(ld_list, dtype=np.float32)
+    rd_lut = np.asarray(rd_list, dtype=np.float32)
+    np.take(ld_lut, rng.integers(0, len(ld_lut), size=sample, dtype=np.int8), out=ld)
+    np.take(rd_lut, rng.integers(0, len(rd_lut), size=sample, dtype=np.int8), out=rd)
 
     # Calculate lnnz using lr, lc, ld
-    lnnz = lr * lc * ld
+    np.multiply(lr, lc, out=lnnz)
+    lnnz *= ld
     # Calculate rnnz using lc, rc, rd
-    rnnz = lc * rc * rd
-
-    # Concatenate lr, lc, rc, ld, rd, lnnz, rnnz
-    concat_lr_to_rnnz = np.concatenate((lr,lc,rc,ld,rd,lnnz,rnnz), axis = 1)
+    np.multiply(lc, rc, out=rnnz)
+    rnnz *= rd
 
     # Create DataFrame and Type Conversion
-    result_df = pd.DataFrame(concat_lr_to_rnnz,columns=['lr','lc','rc','ld','rd','lnnz','rnnz']).astype({'lr':'int','lc':'int','rc':'int','lnnz':'int','rnnz':'int'})
+    result_df = pd.DataFrame(out,columns=['lr','lc','rc','ld','rd','lnnz','rnnz']).astype({'lr':'int32','lc':'int32','rc':'int32','lnnz':'int32','rnnz':'int32'})
 
     return result_df
 
 
+# Evaluate the filter predicates of every row in one parallel pass
+@njit(parallel=True)
+def lhs_filter_mask(lr, lc, rc, lnnz, rnnz, intmaxvalue, maxnnz):
+
+    mask = np.empty(lr.shape[0], dtype=np.bool_)
+
+    for i in prange(lr.shape[0]):
+        # Products are widened to int64 so that they cannot overflow
+        mask[i] = (lnnz[i] < intmaxvalue
+                   and np.int64(lc[i]) * np.int64(rc[i]) < intmaxvalue
+                   and np.int64(lr[i]) * np.int64(rc[i]) < intmaxvalue
+                   and lnnz[i] < maxnnz
+                   and rnnz[i] < maxnnz)
+
+    return mask
+
+
 # All the generated 2,500,000 SPMM cases cannot be executed on an executor node due to the limited available memory size or various system limitations imposed by Apache Spark
 # Inexcutable SPMM scenarios need to be removed from offline experiments to avoid unnecessary cost. 
 def lhs_filtering(in_df):
@@ -50,17 +79,14 @@ def lhs_filtering(in_df):
     # Apache Spark limits the NNZs of a matrix to the maximum 32bit integer value. 
     intmaxvalue = 2147483647
 
-    # Removed when nnz of left sparsematrix exceeds intMaxValue    
-    in_df = in_df[in_df['lnnz'] < intmaxvalue]
-
+    # Removed when nnz of left sparsematrix exceeds intMaxValue
     # Removed when nnz of the right densematrix exceeds intMaxValue
-    in_df = in_df[(in_df['lc'] * in_df['rc']) < intmaxvalue]
-
     # Removed when nnz of the result densematrix exceeds intMaxValue
-    in_df = in_df[(in_df['lr'] * in_df['rc']) < intmaxvalue]
-
     # Remove data with lnnz and rnnz greater than 70,000,000 to run on an Executor with a memory size of 32GB
-    result_df = in_df[(in_df['lnnz'] < 70000000) & (in_df['rnnz'] < 70000000)]
+    lr, lc, rc, lnnz, rnnz = (in_df[c].to_numpy() for c in ['lr','lc','rc','lnnz','rnnz'])
+    mask = lhs_filter_mask(lr, lc, rc, lnnz, rnnz, intmaxvalue, 70000000)
+
+    result_df = in_df.loc[mask]
 
     return result_df
 
@@ -68,5 +94,5 @@ def lhs_filtering(in_df):
 lhs_df = lhs_generate()
 preprocessed_lhs_df = lhs_filtering(lhs_df)
 
-# Save preprocessed lhs dataframe
-preprocessed_lhs_df.to_csv('../data/raw-lhs-data.csv',index=False)
+# Save preprocessed lhs dataframe with the pyarrow CSV writer
+pacsv.write_csv(pa.Table.from_pandas(preprocessed_lhs_df, preserve_index=False), '../data/raw-lhs-data.csv')
@@ -1,6 +1,7 @@
 # Let It Sparse : test set generation
 
 # Load python packages
+import numpy as np
 import pandas as pd
 import sys
 import re
@@ -8,29 +9,21 @@ import re
 # Total dataset
 dataset = pd.read_csv("../data/spmm-data.csv")
 
-# Row number of train set extracted with DOE
-train_set = []
+# Regular expression for row numbers, skipping the bracketed position index R prints at the start of each line
+RULE = re.compile(rb'(?<![\[0-9])[0-9]+(?![\]0-9])')
 
-train_row_start = False
-line_number = 0
 # Input from pipeline
-for line in sys.stdin:
-    
-    line_number += 1
-    
-    if (line_number == 5):
-        train_row_start = True
-    if (train_row_start == True):
-        # Set up regular expression compilation
-        rule = re.compile('[0-9]+')
-        # Apply regular expression to line
-        temp = rule.findall(line)
-        # Collect rows of train set
-        for row in temp[1:]:
-            train_set.append(int(row)-1)
+lines = sys.stdin.buffer.read().split(b'\n', 4)
+# Rows of train set are printed from the 5th line on
+train_rows = lines[4] if len(lines) == 5 else b''
+
+# Row number of train set extracted with DOE
+train_set = np.fromiter(map(int, RULE.findall(train_rows)), dtype=np.int64) - 1
 
 # Generate data that is not extracted as train set from the entire dataset as test set
-test_set = dataset.drop(index=train_set, axis=0)
+test_mask = np.ones(len(dataset), dtype=bool)
+test_mask[train_set] = False
+test_set = dataset.iloc[test_mask]
 
 # Save test set
 test_set.to_csv("../data/test-set.csv",index=False)
@@ -2,6 +2,7 @@
 
 # Load python packages
 # 1. Basic data processing packages
+import pandas as pd
 import numpy as np
 import pickle
 # 2. Machine learning packages
@@ -20,6 +21,7 @@ parser.add_argument('--d_l', type=float)
 parser.add_argument('--d_r', type=float)
 parser.add_argument('--nnz_l', type=int)
 parser.add_argument('--nnz_r', type=int)
+parser.add_argument('--csv', help='CSV file with lr, lc, rc, ld, rd, lnnz, rnnz columns, inferred as one batch')
 args = parser.parse_args()
 
 # Convert argument to variable
@@ -30,40 +32,65 @@ D_L = args.d_l
 D_R = args.d_r
 NNZ_L = args.nnz_l
 NNZ_R = args.nnz_r
+CSV = args.csv
 
 # Load Model
 smsm_dnn_model = tf.keras.models.load_model('./model/smsm_dnn_model')
 smdm_dnn_model = tf.keras.models.load_model('./model/smdm_dnn_model')
 
+# Freeze model weights to constants (kernel and bias of each dense layer, in order)
+SMSM_WEIGHTS = [tf.constant(w) for w in smsm_dnn_model.get_weights()]
+SMDM_WEIGHTS = [tf.constant(w) for w in smdm_dnn_model.get_weights()]
+
 # Load Scaler
 minmax_scaler = pickle.load(open('./scaler/minmax_scaler.pkl','rb'))
+# MinMaxScaler.transform computes X * scale_ + min_
+SCALE = minmax_scaler.scale_.astype(np.float32)
+MIN = minmax_scaler.min_.astype(np.float32)
 
+# Optimal SPMM method for each index returned by dual_predict
+OPTIM_METHODS = ["Sparse X Dense", "Sparse X Sparse"]
 
-def inference(nr_l, nc_l, nc_r, d_l, d_r, nnz_l, nnz_r):
-		
-	# Create input feature to use as model input
-	input_feature = np.array([[nr_l, nc_l, nc_r, d_l, d_r, nnz_l, nnz_r]])
-	
-	# Apply minmax scaler to input_feature
-	input_feature_scaler = minmax_scaler.transform(input_feature)
+# Forward pass of the dnn model: dense + relu hidden layers followed by a linear output layer
+def dnn_forward(x, weights):
+	for kernel, bias in zip(weights[0:-2:2], weights[1:-2:2]):
+		x = tf.nn.relu(tf.matmul(x, kernel) + bias)
+	return tf.matmul(x, weights[-2]) + weights[-1]
+
+# Run both models on the frozen weights in a single XLA-compiled graph,
+# and select the optimal method inside the graph (sm*dm wins ties, so it comes first)
+@tf.function(jit_compile=True, input_signature=[tf.TensorSpec([None,7], tf.float32)])
+def dual_predict(x):
+	smsm = dnn_forward(x, SMSM_WEIGHTS)
+	smdm = dnn_forward(x, SMDM_WEIGHTS)
+	return smsm, smdm, tf.argmin(tf.concat([smdm, smsm], axis=1), axis=1)
+
+
+def inference(input_feature):
 	
-	# Generate model-specific predictions for input feature
-	smsm_dnn_result = smsm_dnn_model.predict(input_feature_scaler)
-	smdm_dnn_result = smdm_dnn_model.predict(input_feature_scaler)
+	# Apply minmax scaler to input_feature in place
+	input_feature_scaler = np.multiply(input_feature, SCALE, out=input_feature)
+	input_feature_scaler += MIN
 	
-	# If sm*dm is better than sm*sm
-	if (smdm_dnn_result[0] <= smsm_dnn_result[0]):
-	    optim_method = "Sparse X Dense"
-	# If sm*sm is better than sm*dm
-	else:
-	    optim_method = "Sparse X Sparse"
+	# Generate model-specific predictions and the optimal method for every input feature in one batch
+	smsm_dnn_results, smdm_dnn_results, optim_indices = (result.numpy() for result in dual_predict(input_feature_scaler))
 	
-	# Generate result
-	result = "Sparse X Sparse Latency : " + str(int(smsm_dnn_result[0])) + "ms , " + \
-	"Sparse X Dense Latency : " + str(int(smdm_dnn_result[0])) + "ms , " + \
-	"Optimal Method : " + optim_method
+	for smsm_dnn_result, smdm_dnn_result, optim_index in zip(smsm_dnn_results, smdm_dnn_results, optim_indices):
+		
+		optim_method = OPTIM_METHODS[optim_index]
+		
+		# Generate result
+		result = "Sparse X Sparse Latency : " + str(int(smsm_dnn_result[0])) + "ms , " + \
+		"Sparse X Dense Latency : " + str(int(smdm_dnn_result[0])) + "ms , " + \
+		"Optimal Method : " + optim_method
+
+		print(result)
 
-	print(result)
+# Create input feature to use as model input
+if CSV:
+	input_feature = pd.read_csv(CSV)[['lr','lc','rc','ld','rd','lnnz','rnnz']].to_numpy(dtype=np.float32)
+else:
+	input_feature = np.array([[NR_L, NC_L, NC_R, D_L, D_R, NNZ_L, NNZ_R]], dtype=np.float32)
 
 # Execute inference
-inference(NR_L, NC_L, NC_R, D_L, D_R, NNZ_L, NNZ_R)
+inference(input_feature)
@@ -17,29 +17,38 @@ test = pd.read_csv('../data/test-set.csv')
 
 # Feature and Target settings
 X_test = test[['lr','lc','rc','ld','rd','lnnz','rnnz']] 
-smsm_y_test = test['smsm_total_latency']
-smdm_y_test = test['smdm_total_latency']
+smsm_y_test = test['smsm_total_latency'].to_numpy(dtype=np.float32)
+smdm_y_test = test['smdm_total_latency'].to_numpy(dtype=np.float32)
 
 # Load Scaler
 minmax_scaler = pickle.load(open('./scaler/minmax_scaler.pkl','rb'))
 
 # Data scaling
-X_test = minmax_scaler.transform(X_test)
+X_test = minmax_scaler.transform(X_test).astype(np.float32)
 
 # Load Model
 smsm_dnn_model = tf.keras.models.load_model('./model/smsm_dnn_model')
 smdm_dnn_model = tf.keras.models.load_model('./model/smdm_dnn_model')
 
+# Run both models over the same input batch in a single graph invocation
+@tf.function(input_signature=[tf.TensorSpec([None,7], tf.float32)])
+def dual_predict(x):
+	return smsm_dnn_model(x, training=False), smdm_dnn_model(x, training=False)
+
 # MAPE
 def mean_absolute_percentage_error(y_test, y_pred):
-    y_test, y_pred = np.array(y_test), np.array(y_pred)
-    return np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+    return np.mean(np.abs(y_test - y_pred) / y_test) * 100
 
 def test_models():
 			
-	# Predict testset by model
-	smsm_dnn_y_pred = smsm_dnn_model.predict(X_test).reshape(-1,)
-	smdm_dnn_y_pred = smdm_dnn_model.predict(X_test).reshape(-1,)
+	# Predict testset by model, streaming batches through both models at once
+	smsm_dnn_y_pred, smdm_dnn_y_pred = [], []
+	for x in tf.data.Dataset.from_tensor_slices(X_test).batch(16384).prefetch(tf.data.AUTOTUNE):
+		smsm_batch_pred, smdm_batch_pred = dual_predict(x)
+		smsm_dnn_y_pred.append(smsm_batch_pred.numpy())
+		smdm_dnn_y_pred.append(smdm_batch_pred.numpy())
+	smsm_dnn_y_pred = np.concatenate(smsm_dnn_y_pred).reshape(-1,)
+	smdm_dnn_y_pred = np.concatenate(smdm_dnn_y_pred).reshape(-1,)
 	
 	# Sparse X Sparse prediction model performance
 	print('Sparse X Sparse prediction model')
@@ -12,18 +12,32 @@ import tensorflow as tf
 # 4. Other Packages
 from pathlib import Path
 
+# Enable XLA JIT compilation
+tf.config.optimizer.set_jit(True)
+
 # Load dataset
 train = pd.read_csv('../data/train-set.csv')
 
 # Feature and Target settings
 X_train = train[['lr','lc','rc','ld','rd','lnnz','rnnz']] 
-smsm_y_train = train['smsm_total_latency']
-smdm_y_train = train['smdm_total_latency']
+smsm_y_train = train['smsm_total_latency'].to_numpy(dtype=np.float32)
+smdm_y_train = train['smdm_total_latency'].to_numpy(dtype=np.float32)
 
 # Data scaling
 minmax_scaler = MinMaxScaler()
 minmax_scaler.fit(X_train)
-X_train = minmax_scaler.transform(X_train)
+X_train = minmax_scaler.transform(X_train).astype(np.float32)
+
+# Input pipeline settings
+BATCH_SIZE = 32
+VALIDATION_SPLIT = 0.1
+
+# Build a cached and prefetched tf.data pipeline from features and targets
+def build_dataset(x, y, shuffle=False):
+    dataset = tf.data.Dataset.from_tensor_slices((x, y)).cache()
+    if shuffle:
+        dataset = dataset.shuffle(len(x))
+    return dataset.batch(BATCH_SIZE).prefetch(tf.data.AUTOTUNE)
 
 # Network and Compile settings for dnn model
 def build_dnn_model(input_shape):
@@ -44,17 +58,31 @@ def train_and_save_dnn_models():
     smsm_dnn_model = build_dnn_model((X_train.shape[1],))
     smdm_dnn_model = build_dnn_model((X_train.shape[1],))
     
+    # Both models are trained together as the two outputs of one model sharing the input pipeline
+    inputs = tf.keras.Input(shape=(X_train.shape[1],))
+    dual_dnn_model = tf.keras.Model(inputs, [smsm_dnn_model(inputs), smdm_dnn_model(inputs)])
+    dual_dnn_model.compile(optimizer=tf.keras.optimizers.Adagrad(learning_rate=0.07), loss=['mape','mape'])
+    
+    # Hold out the last rows as validation data, as validation_split does
+    split = int(round(len(X_train) * (1. - VALIDATION_SPLIT)))
+    train_ds = build_dataset(X_train[:split], (smsm_y_train[:split], smdm_y_train[:split]), shuffle=True)
+    val_ds = build_dataset(X_train[split:], (smsm_y_train[split:], smdm_y_train[split:]))
+    
     callback = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=100)
     
-    smsm_dnn_model.fit(X_train, smsm_y_train, epochs=1000, validation_split=0.1, verbose=0, callbacks=[callback])
-    smdm_dnn_model.fit(X_train, smdm_y_train, epochs=1000, validation_split=0.1, verbose=0, callbacks=[callback])
+    dual_dnn_model.fit(train_ds, epochs=1000, validation_data=val_ds, verbose=0, callbacks=[callback])
     
     # Save Model and Scaler
     Path('./model').mkdir(parents=True, exist_ok=True)
     Path('./scaler').mkdir(parents=True, exist_ok=True)
     smsm_dnn_model.save("./model/smsm_dnn_model")
     smdm_dnn_model.save("./model/smdm_dnn_model")
+    # Save the weights as numpy arrays as well, so that the models can be run without TensorFlow
+    np.savez('./model/smsm_dnn_model.npz', *smsm_dnn_model.get_weights())
+    np.savez('./model/smdm_dnn_model.npz', *smdm_dnn_model.get_weights())
     pickle.dump(minmax_scaler, open('./scaler/minmax_scaler.pkl', 'wb'))
+    # Save only the scaler parameters as well, so that sklearn is not needed to apply it
+    np.savez('./scaler/minmax_scaler.npz', scale=minmax_scaler.scale_, min_=minmax_scaler.min_)
 
 # Execute train and save dnn models
 train_and_save_dnn_models()
@@ -1,54 +1,71 @@
 # Import package
 import json
 import numpy as np
-import tensorflow as tf
-import pickle
-from sklearn.preprocessing import MinMaxScaler
 
-# Load Model
-smsm_dnn_model = tf.keras.models.load_model('/var/task/dos/dos/model/smsm_dnn_model')
-smdm_dnn_model = tf.keras.models.load_model('/var/task/dos/dos/model/smdm_dnn_model')
+# Load Model weights (kernel and bias of each dense layer, in order)
+def load_weights(path):
+    weights = np.load(path)
+    return [weights['arr_%d' % i].astype(np.float32) for i in range(len(weights.files))]
 
-# Load Scaler
-minmax_scaler = pickle.load(open('/var/task/dos/dos/scaler/minmax_scaler.pkl','rb'))
+smsm_dnn_model = load_weights('/var/task/dos/dos/model/smsm_dnn_model.npz')
+smdm_dnn_model = load_weights('/var/task/dos/dos/model/smdm_dnn_model.npz')
+
+# Load Scaler parameters (MinMaxScaler.transform computes X * scale_ + min_)
+minmax_scaler = np.load('/var/task/dos/dos/scaler/minmax_scaler.npz')
+SCALE = minmax_scaler['scale'].astype(np.float32)
+MIN = minmax_scaler['min_'].astype(np.float32)
+
+# Input buffer reused across requests
+input_feature = np.empty((1,7), dtype=np.float32)
+
+# Forward pass of the dnn model: dense + relu hidden layers followed by a linear output layer
+def predict(weights, x):
+    for kernel, bias in zip(weights[0:-2:2], weights[1:-2:2]):
+        x = np.maximum(x @ kernel + bias, 0)
+    return x @ weights[-2] + weights[-1]
+
+# Generate predictions of both models for the same input
+def dual_predict(x):
+    return predict(smsm_dnn_model, x), predict(smdm_dnn_model, x)
 
 def handler(event, context):
     
     body = event["body-json"]
 
-    # Preprocess features from events
-    lr = body["lr"]
-    lc = body["lc"]
-    rc = body["rc"]
-    ld = body["ld"]
-    rd = body["rd"]
-    lnnz = body["lnnz"]
-    rnnz = body["rnnz"]
+    # A list of matrix multiplication arguments is predicted as one batch
+    batch = isinstance(body, list)
+    rows = body if batch else [body]
 
     # Create input feature to use as model input
-    input_feature = np.array([[lr,lc,rc,ld,rd,lnnz,rnnz]])
+    features = input_feature if len(rows) == 1 else np.empty((len(rows),7), dtype=np.float32)
+    for i, row in enumerate(rows):
+        # Preprocess features from events
+        features[i] = (row["lr"],row["lc"],row["rc"],row["ld"],row["rd"],row["lnnz"],row["rnnz"])
     
-    # Apply minmax scaler to input_feature
-    input_feature_scaler = minmax_scaler.transform(input_feature)
+    # Apply minmax scaler to input_feature in place
+    input_feature_scaler = np.multiply(features, SCALE, out=features)
+    input_feature_scaler += MIN
 
     # Generate model-specific predictions for input feature
-    smsm_dnn_result = smsm_dnn_model.predict(input_feature_scaler)
-    smdm_dnn_result = smdm_dnn_model.predict(input_feature_scaler)
-
-    # If sm*dm is better than sm*sm
-    if (smdm_dnn_result[0] <= smsm_dnn_result[0]):
-        optim_method = "smdm"
-    # If sm*sm is better than sm*dm
-    else:
-        optim_method = "smsm"
-    
-    # Generate result
-    result = "sm*sm : " + str(smsm_dnn_result[0]) + " , " + \
-		"sm*dm : " + str(smdm_dnn_result[0]) + " , " + \
-		"optim_method : " + optim_method
+    smsm_dnn_results, smdm_dnn_results = dual_predict(input_feature_scaler)
+
+    result = []
+    for smsm_dnn_result, smdm_dnn_result in zip(smsm_dnn_results, smdm_dnn_results):
+
+        # If sm*dm is better than sm*sm
+        if (smdm_dnn_result[0] <= smsm_dnn_result[0]):
+            optim_method = "smdm"
+        # If sm*sm is better than sm*dm
+        else:
+            optim_method = "smsm"
+        
+        # Generate result
+        result.append("sm*sm : " + str(smsm_dnn_result[0]) + " , " + \
+            "sm*dm : " + str(smdm_dnn_result[0]) + " , " + \
+            "optim_method : " + optim_method)
 
     # Return result
     return {
         'statusCode': 200,
-        'body': json.dumps(result)
+        'body': json.dumps(result if batch else result[0])
     }